@@ -1,25 +1,25 @@
-from typing import Type, TypeVar
+from typing import Type
 
 from cafe.agents.base_agent import BaseAgent
 from cafe.agents.evaluating import EvaluatingAgent
 from cafe.agents.feature_engineering import FeatureEngineeringAgent
 from cafe.agents.judge import JudgeAgent, RuleBasedJudge
 
-T = TypeVar("T", bound=BaseAgent)
-
 
 class AgentFactory:
     """Factory for creating agent instances."""
 
+    _AGENTS: dict[str, Type[BaseAgent]] = {
+        "feature_engineering": FeatureEngineeringAgent,
+        "rule_based_judge": RuleBasedJudge,
+        "judge": JudgeAgent,
+        "evaluating": EvaluatingAgent
+    }
+
     @staticmethod
-    def create_agent(agent_type: str, *args, **kwargs) -> T:
+    def create_agent(agent_type: str, *args, **kwargs) -> BaseAgent:
         """Create an agent based on the specified type."""
-        agents: dict[str, Type[BaseAgent]] = {
-            "feature_engineering": FeatureEngineeringAgent,
-            "rule_based_judge": RuleBasedJudge,
-            "judge": JudgeAgent,
-            "evaluating": EvaluatingAgent
-        }
-        if agent_type not in agents:
+        agent_cls = AgentFactory._AGENTS.get(agent_type)
+        if agent_cls is None:
             raise ValueError(f"Unknown agent type: {agent_type}")
-        return agents[agent_type](*args, **kwargs)
+        return agent_cls(*args, **kwargs)
@@ -1,8 +1,8 @@
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, List
 import pandas as pd
 from .base_agent import BaseAgent
 from cafe.core.snowflake_client import SnowflakeClient
-from cafe.models.data_frame_builder import DataFrameBuilder
 from cafe.strategies.evaluation import EvaluationStrategy, XGBoostEvaluation
 
 class EvaluatingAgent(BaseAgent):
@@ -11,15 +11,17 @@ class EvaluatingAgent(BaseAgent):
         super().__init__()
         self.snowflake_client = snowflake_client
         self.evaluation_strategy = evaluation_strategy or XGBoostEvaluation()
-        self.data_frame_builder = DataFrameBuilder()
 
     def run(self, queries: List[str]) -> Dict[str, Any]:
         """Build a DataFrame from query results and evaluate ML model."""
-        data_frames = []
-        for query in queries:
-            result = self.snowflake_client.execute_query(query)
-            df = self.data_frame_builder.build(result)
-            data_frames.append(df)
+        # Query latency dominates; fan the executions out so wall-clock is
+        # bounded by the slowest query rather than their sum. The connector
+        # builds the DataFrames straight from the columnar wire format.
+        with ThreadPoolExecutor(max_workers=min(8, len(queries))) as executor:
+            data_frames = list(executor.map(
+                lambda query: self.snowflake_client.execute_query(query, as_dataframe=True),
+                queries,
+            ))
         combined_df = pd.concat(data_frames, axis=1)
         metrics = self.evaluation_strategy.evaluate(combined_df)
         self.logger.info(f"Evaluation metrics: {metrics}")
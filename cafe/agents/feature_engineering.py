@@ -1,13 +1,50 @@
 from pathlib import Path
 from typing import Any, Dict
 
-import requests
+import orjson
 
 from cafe.core.semantic_model import SemanticModelManager
 from cafe.core.snowflake_client import SnowflakeClient
 from .base_agent import BaseAgent
 from ..utils.config import load_config
 
+# Prompt template, built once at import instead of inside every call.
+_BUSINESS_QUESTION_PROMPT = """
+You are a helpful assistant whose goal is to generate one insightful question about the data described in the provided semantic model. This question should be relevant for creating new features that could improve the performance of a forecasting model (like XGBoost) for business metrics. The question can also be framed from a business analytics perspective, aiming to uncover meaningful trends or patterns.
+
+Here is the content of the semantic model file:
+```yaml
+{semantic_model_content}
+```
+"""
+
+# Request fields that never change between calls; merged into each payload
+# instead of rebuilding the full dict per call.
+_LLM_REQUEST_DEFAULTS = {
+    "model": "claude-3-5-sonnet",
+    "max_tokens": 4096,
+    "top_p": 1,
+    "stream": False
+}
+
+# Static tool spec; built once so it isn't re-marshalled on every call.
+_WEATHER_TOOL_SPEC = {
+    "tool_spec": {
+        "type": "generic",
+        "name": "get_weather",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "location": {
+                    "type": "string",
+                    "description": "The city and state, e.g. San Francisco, CA"
+                }
+            },
+            "required": ["location"]
+        }
+    }
+}
+
 
 class FeatureEngineeringAgent(BaseAgent):
     """Agent that generates feature engineering SQL queries using Cortex Analyst."""
@@ -32,14 +69,7 @@ class FeatureEngineeringAgent(BaseAgent):
         """Generate a business question using the Snowflake LLM based on the semantic model."""
         semantic_model_content = self.semantic_model_manager.load_yaml(semantic_model_path)
 
-        prompt = f"""
-You are a helpful assistant whose goal is to generate one insightful question about the data described in the provided semantic model. This question should be relevant for creating new features that could improve the performance of a forecasting model (like XGBoost) for business metrics. The question can also be framed from a business analytics perspective, aiming to uncover meaningful trends or patterns.
-
-Here is the content of the semantic model file:
-```yaml
-{semantic_model_content}
-```
-"""
+        prompt = _BUSINESS_QUESTION_PROMPT.format(semantic_model_content=semantic_model_content)
         response = self.call_llm(prompt)
         self.logger.info(f"Generated business question: {response}")
         answer = response["choices"][0]["message"]["content"]
@@ -53,9 +83,10 @@ Here is the content of the semantic model file:
             "semantic_model": semantic_model,
         }
 
-        resp = requests.post(
+        resp = self.snowflake_client.session.post(
             url=f"https://{self.host}/api/v2/cortex/analyst/message",
-            json=request_body,
+            # Encode in C with orjson instead of requests' stdlib json= path.
+            data=orjson.dumps(request_body),
             headers={
                 "Authorization": f"Bearer {self.snowflake_client.get_jwt_token()}",
                 "Content-Type": "application/json",
@@ -63,37 +94,21 @@ Here is the content of the semantic model file:
         )
         request_id = resp.headers.get("X-Snowflake-Request-Id")
         if resp.status_code < 400:
-            self.logger.debug(f"Response from Cortex Analyst: {resp.json()}")
-            return {**resp.json(), "request_id": request_id}
+            # The parsed response is a fresh dict, so annotate it in place
+            # rather than splat-copying the whole response.
+            payload = orjson.loads(resp.content)
+            self.logger.debug(f"Response from Cortex Analyst: {payload}")
+            payload["request_id"] = request_id
+            return payload
         else:
             raise Exception(f"Failed request (id: {request_id}): {resp.text}")
 
     def call_cortex_tool(self, prompt: str) -> dict:
         """Call the Cortex tool API with a prompt and return the response."""
         data = {
-            "model": "claude-3-5-sonnet",
+            **_LLM_REQUEST_DEFAULTS,
             "messages": [{"role": "user", "content": prompt}],
-            "tools": [
-                {
-                    "tool_spec": {
-                        "type": "generic",
-                        "name": "get_weather",
-                        "input_schema": {
-                            "type": "object",
-                            "properties": {
-                                "location": {
-                                    "type": "string",
-                                    "description": "The city and state, e.g. San Francisco, CA"
-                                }
-                            },
-                            "required": ["location"]
-                        }
-                    }
-                }
-            ],
-            "max_tokens": 4096,
-            "top_p": 1,
-            "stream": False
+            "tools": [_WEATHER_TOOL_SPEC],
         }
 
         return self.snowflake_client.call_cortex_llm(prompt, data)
@@ -101,11 +116,8 @@ Here is the content of the semantic model file:
     def call_llm(self, prompt: str) -> dict:
         """Call the Cortex tool API with a prompt and return the response."""
         data = {
-            "model": "claude-3-5-sonnet",
+            **_LLM_REQUEST_DEFAULTS,
             "messages": [{"role": "user", "content": prompt}],
-            "max_tokens": 4096,
-            "top_p": 1,
-            "stream": False
         }
 
         return self.snowflake_client.call_cortex_llm(data)
@@ -1,9 +1,36 @@
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Dict
 
 from cafe.core.snowflake_client import SnowflakeClient
 from cafe.strategies.validation import ExecutionValidation, SemanticValidation, SyntaxValidation, ValidationStrategy
 from .base_agent import BaseAgent
 
+# Prompt template, built once at import instead of inside every call.
+_EVALUATION_PROMPT = """
+You are a helpful agent that evaluates the usefulness of a SQL query:
+{sql_query}
+---
+and its shortened result:
+columns: {columns}
+frist 10 rows: {rows}
+---
+in the context of the following user prompt:
+{business_question}
+---
+Considering the goal of extending the database for future engineering tasks,
+does this query seem likely to contribute meaningfully? Explain your reasoning
+and return '<EVAL>1</EVAL>' if contributes meaningfully '<EVAL>0</EVAL>' if not in final line.
+        """
+
+# Request fields that never change between judge calls.
+_LLM_REQUEST_DEFAULTS = {
+    "model": "claude-3-5-sonnet",  # Or another suitable model
+    "max_tokens": 500,  # Adjust as needed
+    "top_p": 0.9,
+    "temperature": 0.2,
+    "stream": False
+}
+
 
 class RuleBasedJudge(BaseAgent):
     """Agent that validates SQL queries for correctness and usefulness."""
@@ -22,15 +49,33 @@ class RuleBasedJudge(BaseAgent):
 
     def run(self, sql: str, prompt: str, semantic_model: str) -> Dict[str, Any]:
         """Validate a SQL query using multiple strategies."""
-        query_result = self.snowflake_client.execute_query(sql)
+        # Strategies that don't consume the executed result run first and
+        # short-circuit; the candidate SQL itself is only executed when a
+        # strategy actually reads its result.
+        local_strategies = [s for s in self.validation_strategies if not s.requires_query_result]
+        remote_strategies = [s for s in self.validation_strategies if s.requires_query_result]
 
         results = {}
-        for strategy in self.validation_strategies:
-            is_valid, message = strategy.validate(sql, prompt, semantic_model, query_result)
+        for strategy in local_strategies:
+            is_valid, message = strategy.validate(sql, prompt, semantic_model, None)
             results[strategy.__class__.__name__] = {"valid": is_valid, "message": message}
             if not is_valid:
                 self.logger.error(f"Validation failed: {message}")
                 return results
+
+        if remote_strategies:
+            query_result = self.snowflake_client.execute_query(sql)
+            # Remote strategies are independent; overlap their network waits.
+            with ThreadPoolExecutor(max_workers=len(remote_strategies)) as executor:
+                remote_results = list(executor.map(
+                    lambda strategy: strategy.validate(sql, prompt, semantic_model, query_result),
+                    remote_strategies,
+                ))
+            for strategy, (is_valid, message) in zip(remote_strategies, remote_results):
+                results[strategy.__class__.__name__] = {"valid": is_valid, "message": message}
+                if not is_valid:
+                    self.logger.error(f"Validation failed: {message}")
+                    return results
         self.logger.info("All validations passed")
         return results
 
@@ -79,21 +124,12 @@ class JudgeAgent(BaseAgent):
         # the LLM to evaluate the query and its potential impact based on the
         # original prompt.
 
-        evaluation_prompt = f"""
-You are a helpful agent that evaluates the usefulness of a SQL query:
-{sql_query}
----
-and its shortened result:
-columns: {sql_result["columns"]}
-frist 10 rows: {sql_result["data"][:10]}
----
-in the context of the following user prompt:
-{business_question}
----
-Considering the goal of extending the database for future engineering tasks,
-does this query seem likely to contribute meaningfully? Explain your reasoning
-and return '<EVAL>1</EVAL>' if contributes meaningfully '<EVAL>0</EVAL>' if not in final line.
-        """
+        evaluation_prompt = _EVALUATION_PROMPT.format(
+            sql_query=sql_query,
+            columns=sql_result["columns"],
+            rows=sql_result["data"][:10],
+            business_question=business_question,
+        )
         response = self._call_snowflake_llm(evaluation_prompt)
         self.logger.debug(f"Judge LLM response: {response}")
         response_content = response.get("choices", [{}])[0].get("message", {}).get("content", "")
@@ -106,12 +142,8 @@ and return '<EVAL>1</EVAL>' if contributes meaningfully '<EVAL>0</EVAL>' if not
     def _call_snowflake_llm(self, prompt: str) -> Dict[str, Any]:
         """Calls the Snowflake LLM API (inference:complete endpoint)."""
         data = {
-            "model": "claude-3-5-sonnet",  # Or another suitable model
+            **_LLM_REQUEST_DEFAULTS,
             "messages": [{"role": "user", "content": prompt}],
-            "max_tokens": 500,  # Adjust as needed
-            "top_p": 0.9,
-            "temperature": 0.2,
-            "stream": False
         }
         return self.snowflake_client.call_cortex_llm(data)
 
@@ -1,50 +1,229 @@
+import functools
+import gzip
 import os
+import re
+import tempfile
 import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
 from typing import Any, Dict
 
 import yaml
 
+try:  # libyaml C bindings are ~5-10x faster when available
+    from yaml import CSafeDumper as _Dumper, CSafeLoader as _Loader
+except ImportError:
+    from yaml import SafeDumper as _Dumper, SafeLoader as _Loader
+
 from cafe.models.semantic_model_graph import SemanticModelGraph
 from cafe.utils.logger import setup_logger
 
 
+# Shared dump settings: keep insertion order (skips a per-mapping sort and
+# reduces diff churn) and disable the line-wrapping state machine.
+_DUMP_KWARGS = {
+    "default_flow_style": False,
+    "sort_keys": False,
+    "width": 10_000,
+    "allow_unicode": True,
+}
+
+# Matches a top-level mapping key at the start of a line.
+_TOP_LEVEL_KEY_RE = re.compile(r"^([A-Za-z_][\w-]*):", re.MULTILINE)
+
+
+@functools.lru_cache(maxsize=32)
+def _parse_cached(path: str, mtime_ns: int, size: int) -> Any:
+    """Parse a semantic model file, cached on (path, mtime, size)."""
+    # Stream straight from the file handle: no intermediate full-file string.
+    with open(path, 'r') as file:
+        return yaml.load(file, Loader=_Loader)
+
+
 class SemanticModelManager:
     """Manages semantic models, including loading, updating, and graph tracking."""
 
+    # Once the main file holds this many verified queries, new entries spill
+    # into side shards so single-file writes and uploads stop growing.
+    _SHARD_THRESHOLD = 500
+
     def __init__(self):
         self.logger = setup_logger(__name__)
         self.graph = SemanticModelGraph()
+        self._io_pool = None  # Created lazily on the first stage upload
+        self._pending: Dict[Path, Future] = {}
 
     def load_yaml(self, file_path: str | Path) -> str:
         """Load a YAML file as a string."""
-        if not os.path.exists(file_path):
+        try:
+            with open(file_path, 'r') as file:
+                return file.read()
+        except FileNotFoundError:
             raise FileNotFoundError(f"Semantic model file not found: {file_path}")
-        with open(file_path, 'r') as file:
-            return file.read()
 
     def parse_yaml(self, yaml_content: str) -> Dict[str, Any]:
         """Parse YAML content into a dictionary."""
-        return yaml.safe_load(yaml_content)
+        return yaml.load(yaml_content, Loader=_Loader)
+
+    def parse_file(self, file_path: str | Path) -> Dict[str, Any]:
+        """Load and parse a semantic model file, reusing the cached parse while the file is unchanged."""
+        try:
+            stat = os.stat(file_path)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Semantic model file not found: {file_path}")
+        model = _parse_cached(str(file_path), stat.st_mtime_ns, stat.st_size)
+        shard_entries = self._load_shards(file_path)
+        if shard_entries:
+            # Rebuild rather than mutate: the cached parse is shared.
+            model = {
+                **model,
+                "verified_queries": [*model.get("verified_queries", []), *shard_entries],
+            }
+        return model
+
+    def _shard_path(self, file_path: str | Path, n: int) -> Path:
+        file_path = Path(file_path)
+        return file_path.with_name(f"{file_path.stem}.verified_queries_{n}{file_path.suffix}")
+
+    def _shard_paths(self, file_path: str | Path) -> list[Path]:
+        """Existing verified-query shards for a model, in numeric order."""
+        file_path = Path(file_path)
+        pattern = f"{file_path.stem}.verified_queries_*{file_path.suffix}"
+        return sorted(
+            file_path.parent.glob(pattern),
+            key=lambda p: int(p.stem.rsplit("_", 1)[-1]),
+        )
+
+    def _load_shards(self, file_path: str | Path) -> list[Dict[str, Any]]:
+        entries = []
+        for shard in self._shard_paths(file_path):
+            stat = os.stat(shard)
+            entries.extend(_parse_cached(str(shard), stat.st_mtime_ns, stat.st_size) or [])
+        return entries
+
+    def _append_to_shard(self, file_path: str | Path, entry: Dict[str, Any]) -> None:
+        """Spill an entry into the newest side shard, starting a new one when full."""
+        shards = self._shard_paths(file_path)
+        target = shards[-1] if shards else self._shard_path(file_path, 0)
+        if target.exists():
+            text = target.read_text()
+            if text.startswith("- ") + text.count("\n- ") >= self._SHARD_THRESHOLD:
+                target = self._shard_path(file_path, len(shards))
+        with open(target, 'a') as file:
+            file.write(yaml.dump([entry], Dumper=_Dumper, **_DUMP_KWARGS))
+        _parse_cached.cache_clear()
 
     def update_verified_queries(self, file_path: str | Path, query_name: str, question: str, sql: str, verified_by: str = "system") -> None:
         """Update the verified_queries section of a semantic model."""
-        yaml_content = self.load_yaml(file_path)
-        model_dict = self.parse_yaml(yaml_content)
-        if "verified_queries" not in model_dict:
-            model_dict["verified_queries"] = []
-        model_dict["verified_queries"].append(
-            {
-                "name": query_name,
-                "question": question,
-                "sql": sql,
-                "verified_at": int(time.time()),
-                "verified_by": verified_by
+        entry = {
+            "name": query_name,
+            "question": question,
+            "sql": sql,
+            "verified_at": int(time.time()),
+            "verified_by": verified_by
+        }
+        if not self._append_verified_query(file_path, entry):
+            # Slow path: parse only the main file, add the section, dump it
+            # back. parse_file would fold shard entries into the dump while
+            # the shard files stay on disk, duplicating them on every read.
+            try:
+                stat = os.stat(file_path)
+            except FileNotFoundError:
+                raise FileNotFoundError(f"Semantic model file not found: {file_path}")
+            model_dict = _parse_cached(str(file_path), stat.st_mtime_ns, stat.st_size)
+            model_dict = {
+                **model_dict,
+                "verified_queries": [*model_dict.get("verified_queries", []), entry],
             }
-        )
-        with open(file_path, 'w') as file:
-            yaml.safe_dump(model_dict, file)
-        self.logger.info(f"Updated verified_queries in {file_path}")
+            with open(file_path, 'w') as file:
+                yaml.dump(model_dict, file, Dumper=_Dumper, **_DUMP_KWARGS)
+            _parse_cached.cache_clear()  # The file changed; drop stale parses
+        self.logger.info("Updated verified_queries in %s", file_path)
+
+    def _append_verified_query(self, file_path: str | Path, entry: Dict[str, Any]) -> bool:
+        """Append one entry textually when verified_queries is the file's last section.
+
+        Skips the O(file size) parse/dump round-trip; returns False when the
+        fast path does not apply and the caller must rewrite the file.
+        """
+        text = self.load_yaml(file_path)
+        match = None
+        for match in _TOP_LEVEL_KEY_RE.finditer(text):
+            pass
+        if match is None or match.group(1) != "verified_queries":
+            return False
+        line_end = text.find("\n", match.end())
+        rest_of_line = text[match.end():] if line_end == -1 else text[match.end():line_end]
+        if rest_of_line.strip():
+            return False  # Inline value such as `verified_queries: []`
+        # Match the indentation of the existing items: hand-authored models
+        # conventionally indent list items two spaces, and a column-0 append
+        # there would corrupt the file.
+        item_match = re.search(r"\n( *)- ", text[match.end():])
+        indent = item_match.group(1) if item_match else ""
+        if text.count(f"\n{indent}- ", match.end()) >= self._SHARD_THRESHOLD:
+            # The main file is full; spill into a side shard instead of
+            # growing (and re-uploading) an ever-larger single file.
+            self._append_to_shard(file_path, entry)
+            return True
+        block = yaml.dump([entry], Dumper=_Dumper, **_DUMP_KWARGS)
+        if indent:
+            block = "".join(f"{indent}{line}\n" for line in block.splitlines())
+        with open(file_path, 'a') as file:
+            if not text.endswith("\n"):
+                file.write("\n")
+            file.write(block)
+        _parse_cached.cache_clear()
+        return True
+
+    def load_yaml_from_stage(self, stage: str, file_name: str) -> Dict[str, Any]:
+        """Download a semantic model from a Snowflake stage and parse it."""
+        from cafe.core.snowflake_client import SnowflakeClient
+        client = SnowflakeClient()
+        # The temp dir is cleaned up even on errors, and concurrent loads of
+        # the same file name never collide.
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            client.execute_query(f"GET '@{stage}/{file_name}' 'file://{tmp_dir}/'")
+            # GET matches by prefix, so a compressed upload arrives as
+            # <file_name>.gz; open it accordingly.
+            path = next(Path(tmp_dir).iterdir())
+            opener = gzip.open if path.suffix == ".gz" else open
+            with opener(path, 'rt') as file:
+                return yaml.load(file, Loader=_Loader)
+
+    def upload_to_stage(self, file_path: str | Path, stage: str) -> Future:
+        """Upload a semantic model file to a Snowflake stage in the background.
+
+        Returns the pending future; call flush() to wait for all uploads.
+        """
+        if self._io_pool is None:
+            self._io_pool = ThreadPoolExecutor(max_workers=8)
+        path = Path(file_path).resolve()
+        future = self._io_pool.submit(self._put_with_retry, path, stage)
+        self._pending[path] = future
+        return future
+
+    def _put_with_retry(self, path: Path, stage: str, attempts: int = 3) -> None:
+        """PUT a file to the stage, retrying with exponential backoff."""
+        from cafe.core.snowflake_client import SnowflakeClient
+        client = SnowflakeClient()
+        for attempt in range(attempts):
+            try:
+                # AUTO_COMPRESS gzips the YAML before it hits the wire
+                # (highly compressible), PARALLEL splits the upload chunks.
+                client.execute_query(f"PUT 'file://{path}' @{stage} OVERWRITE=TRUE AUTO_COMPRESS=TRUE PARALLEL=4")
+                self.logger.info("Uploaded %s to @%s", path, stage)
+                return
+            except Exception:
+                if attempt == attempts - 1:
+                    raise
+                time.sleep(2 ** attempt)
+
+    def flush(self) -> None:
+        """Wait for all pending stage uploads to finish."""
+        pending, self._pending = self._pending, {}
+        for future in pending.values():
+            future.result()
 
     def create_new_semantic_model(
             self,
@@ -53,12 +232,16 @@ class SemanticModelManager:
             new_table: Dict[str, Any]
     ) -> None:
         """Create a new semantic model with an extended table, excluding verified queries."""
-        original_model = self.parse_yaml(self.load_yaml(original_model_path))
-        new_model = original_model.copy()
-        new_model["name"] = f"{original_model['name']}_extended"
-        new_model["tables"].append(new_table)
+        original_model = self.parse_file(original_model_path)
+        # Build the new model in one go: appending to original_model["tables"]
+        # would leak the new table into the (cached) original parse.
+        new_model = {
+            **original_model,
+            "name": f"{original_model['name']}_extended",
+            "tables": [*original_model.get("tables", []), new_table],
+        }
         new_model.pop("verified_queries", None)  # Exclude verified queries
         with open(new_model_path, 'w') as file:
-            yaml.safe_dump(new_model, file)
+            yaml.dump(new_model, file, Dumper=_Dumper, **_DUMP_KWARGS)
         self.graph.add_edge(original_model_path, new_model_path)
-        self.logger.info(f"Created new semantic model: {new_model_path}")
+        self.logger.info("Created new semantic model: %s", new_model_path)
@@ -1,27 +1,39 @@
 import base64
 import datetime
 import hashlib
+import logging
+import threading
 import time
 from typing import Any
 
 import jwt
+import orjson
 import requests
 import snowflake.connector
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives import serialization
 
 from cafe.utils.config import load_config
 from cafe.utils.logger import setup_logger
 
+_singleton_lock = threading.Lock()
+
 
 class SnowflakeClient:
     """Singleton class for managing Snowflake connection and JWT auth."""
     _instance = None
 
     def __new__(cls):
+        # Double-checked locking: worker threads racing here must not each
+        # open their own Snowflake connection.
         if cls._instance is None:
-            cls._instance = super(SnowflakeClient, cls).__new__(cls)
-            cls._instance._initialize()
+            with _singleton_lock:
+                if cls._instance is None:
+                    instance = super(SnowflakeClient, cls).__new__(cls)
+                    instance._initialize()
+                    cls._instance = instance
         return cls._instance
 
     def _initialize(self):
@@ -41,45 +53,64 @@ class SnowflakeClient:
             )
 
         self.private_key = p_key
-        self.conn = snowflake.connector.connect(
-            user=self.config["user"],
-            account=self.config["account"],
-            private_key=self.private_key,
-            warehouse=self.config["warehouse"],
-            role=self.config["role"]
-        )
-        self.logger.info("Snowflake connection initialized with key pair.")
-
-        # Store the token and its expiration time
-        self._jwt_token = None
-        self._jwt_token_expiry = None
-
-    def _generate_jwt_token(self) -> str:
-        """Generate JWT token for Snowflake REST API (Cortex tool)."""
+        # The JWT issuer/subject are pure functions of the key pair and
+        # account config; compute them once instead of per token refresh.
         org = self.config["organization"]
         account = self.config["account"]
         user = self.config["user"]
 
         # Account identifiers: replace dots with dashes if needed
         account_identifier = f"{org.upper()}-{account.upper()}".replace(".", "-")
-        qualified_username = f"{account_identifier}.{user.upper()}"
+        self._qualified_username = f"{account_identifier}.{user.upper()}"
 
         # Compute the SHA256 fingerprint of the public key (Snowflake format: base64)
-        public_key_der = self.private_key.public_key().public_bytes(
+        self._public_key = p_key.public_key()
+        public_key_der = self._public_key.public_bytes(
             encoding=serialization.Encoding.DER,
             format=serialization.PublicFormat.SubjectPublicKeyInfo,
         )
         sha256_digest = hashlib.sha256(public_key_der).digest()
         public_key_fingerprint = base64.b64encode(sha256_digest).decode("utf-8")
+        self._jwt_issuer = f"{self._qualified_username}.SHA256:{public_key_fingerprint}"
+
+        self.conn = snowflake.connector.connect(
+            user=self.config["user"],
+            account=self.config["account"],
+            private_key=self.private_key,
+            warehouse=self.config["warehouse"],
+            role=self.config["role"]
+        )
+        # The warehouse never changes within a session; set it once here
+        # instead of round-tripping a USE WAREHOUSE per query.
+        self.conn.cursor().execute("USE WAREHOUSE {}".format(self.config["warehouse"]))
+        self._cursor_local = threading.local()
+        self.logger.info("Snowflake connection initialized with key pair.")
 
-        issuer = f"{qualified_username}.SHA256:{public_key_fingerprint}"
+        # One pooled HTTPS session for all Cortex calls: keep-alive avoids a
+        # fresh TCP+TLS handshake per request.
+        self.session = requests.Session()
+        self.session.mount(
+            "https://",
+            HTTPAdapter(
+                pool_connections=8,
+                pool_maxsize=32,
+                max_retries=Retry(total=3, backoff_factor=2, status_forcelist=[429, 500, 502, 503, 504]),
+            ),
+        )
+
+        # Store the token and its expiration time
+        self._jwt_token = None
+        self._jwt_token_expiry = 0.0
+        self._jwt_lock = threading.Lock()
 
+    def _generate_jwt_token(self) -> str:
+        """Generate JWT token for Snowflake REST API (Cortex tool)."""
         now = datetime.datetime.now(datetime.timezone.utc)
         lifetime = datetime.timedelta(minutes=59)
 
         payload = {
-            "iss": issuer,
-            "sub": qualified_username,
+            "iss": self._jwt_issuer,
+            "sub": self._qualified_username,
             "iat": now,
             "exp": now + lifetime,
         }
@@ -90,34 +121,53 @@ class SnowflakeClient:
         if isinstance(token, bytes):
             token = token.decode("utf-8")
 
-        decoded_token = jwt.decode(token, key=self.private_key.public_key(), algorithms=["RS256"])
-        self.logger.info("Generated a JWT with the following payload:\n{}".format(decoded_token))
+        # The verify round-trip is an RSA verify per refresh; only pay for it
+        # when someone is actually reading debug logs.
+        if self.logger.isEnabledFor(logging.DEBUG):
+            decoded_token = jwt.decode(token, key=self._public_key, algorithms=["RS256"])
+            self.logger.debug("Generated a JWT with the following payload:\n{}".format(decoded_token))
 
         return token
 
     def get_jwt_token(self) -> str:
-        """Get the JWT token, generating a new one if expired."""
-        if self._jwt_token and time.time() < self._jwt_token_expiry:
+        """Get the JWT token, generating a new one if it is close to expiry."""
+        # A 60 s safety margin keeps callers from sending a token that
+        # expires mid-flight.
+        if self._jwt_token and time.time() < self._jwt_token_expiry - 60:
             return self._jwt_token
 
-        self._jwt_token = self._generate_jwt_token()
-        self._jwt_token_expiry = int(time.time()) + 3600  # Set expiry to 1 hour from now
+        with self._jwt_lock:
+            if self._jwt_token and time.time() < self._jwt_token_expiry - 60:
+                return self._jwt_token
+            self._jwt_token = self._generate_jwt_token()
+            self._jwt_token_expiry = time.time() + 59 * 60  # Matches the JWT exp claim
         return self._jwt_token
 
-    def execute_query(self, query: str) -> dict[str, Any]:
-        """Execute a SQL query and return results."""
+    def _get_cursor(self):
+        """Return this thread's reusable cursor, creating it on first use."""
+        cursor = getattr(self._cursor_local, "cursor", None)
+        if cursor is None:
+            cursor = self._cursor_local.cursor = self.conn.cursor()
+        return cursor
+
+    def execute_query(self, query: str, as_dataframe: bool = False) -> Any:
+        """Execute a SQL query and return results.
+
+        With as_dataframe=True the result comes back as a pandas DataFrame
+        built from Snowflake's columnar wire format, skipping the
+        row-by-row Python materialization of fetchall.
+        """
         try:
-            cursor = self.conn.cursor()
-            cursor.execute("USE WAREHOUSE {}".format(self.config["warehouse"]))
+            cursor = self._get_cursor()
             cursor.execute(query)
+            if as_dataframe:
+                return cursor.fetch_pandas_all()
             results = cursor.fetchall()
             columns = [desc[0] for desc in cursor.description]
             return {"columns": columns, "data": results}
         except Exception as e:
-            self.logger.error(f"Query execution failed: {str(e)}")
+            self.logger.error("Query execution failed: %s", e)
             raise
-        finally:
-            cursor.close()
 
     def call_cortex_llm(self, data: dict[str, Any]) -> dict:
         """Call the Cortex tool API with a prompt and return the response."""
@@ -131,6 +181,8 @@ class SnowflakeClient:
             "Accept": "application/json"
         }
 
-        response = requests.post(url, headers=headers, json=data)
+        # Encode the body with orjson instead of letting requests run it
+        # through the stdlib json encoder.
+        response = self.session.post(url, headers=headers, data=orjson.dumps(data))
         response.raise_for_status()
-        return response.json()
+        return orjson.loads(response.content)
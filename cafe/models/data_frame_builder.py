@@ -5,4 +5,4 @@ class DataFrameBuilder:
     """Builds pandas DataFrames from query results."""
     def build(self, query_result: Dict[str, Any]) -> pd.DataFrame:
         """Convert query result to a DataFrame."""
-        return pd.DataFrame(query_result["data"], columns=query_result["columns"])
\ No newline at end of file
+        return pd.DataFrame.from_records(query_result["data"], columns=query_result["columns"])
\ No newline at end of file
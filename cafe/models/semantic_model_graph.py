@@ -1,17 +1,40 @@
-import networkx as nx
+from collections import defaultdict
+
 from cafe.utils.logger import setup_logger
 
 class SemanticModelGraph:
     """Directed graph to track relationships between semantic models."""
     def __init__(self):
-        self.graph = nx.DiGraph()
+        # Plain adjacency sets: importing networkx costs hundreds of ms and a
+        # dict-of-dicts per node, and add_edge only needs set inserts.
+        self._adj: dict[str, set[str]] = defaultdict(set)
+        self._preds: dict[str, set[str]] = defaultdict(set)
         self.logger = setup_logger(__name__)
 
     def add_edge(self, source: str, target: str) -> None:
         """Add an edge from source to target semantic model."""
-        self.graph.add_edge(source, target)
-        self.logger.info(f"Added edge: {source} -> {target}")
+        self._adj[source].add(target)
+        self._preds[target].add(source)
+        # Lazy %-formatting: no string is built when INFO is filtered out.
+        self.logger.info("Added edge: %s -> %s", source, target)
+
+    def get_graph(self):
+        """Materialize the adjacency sets as a networkx.DiGraph."""
+        import networkx as nx  # Deferred so the fast path never pays the import
+
+        graph = nx.DiGraph()
+        for source, targets in self._adj.items():
+            graph.add_node(source)
+            for target in targets:
+                graph.add_edge(source, target)
+        return graph
+
+    def display_graph(self) -> None:
+        """Render the graph with a spring layout."""
+        # Deferred: rendering is rare and matplotlib/networkx imports are slow.
+        import matplotlib.pyplot as plt
+        import networkx as nx
 
-    def get_graph(self) -> nx.DiGraph:
-        """Return the directed graph."""
-        return self.graph
\ No newline at end of file
+        graph = self.get_graph()
+        nx.draw(graph, nx.spring_layout(graph), with_labels=True, node_size=1500, font_size=8)
+        plt.show()
@@ -1,8 +1,15 @@
 from abc import ABC, abstractmethod
+
+import sqlglot
+
 from cafe.core.snowflake_client import SnowflakeClient
 
 class ValidationStrategy(ABC):
     """Abstract base class for validation strategies."""
+    # Whether validate() needs the executed query result; strategies that
+    # don't can run before any Snowflake round-trip.
+    requires_query_result = False
+
     @abstractmethod
     def validate(self, sql: str, prompt: str, semantic_model: str, query_result) -> tuple[bool, str]:
         """Validate a SQL query."""
@@ -11,20 +18,38 @@ class ValidationStrategy(ABC):
 class SyntaxValidation(ValidationStrategy):
     """Validate SQL query syntax."""
     def validate(self, sql: str, prompt: str, semantic_model: str, query_result) -> tuple[bool, str]:
-        # Placeholder: Implement syntax checking (e.g., using sqlparse)
-        return True, "Syntax validation passed"
+        # An in-process parse filters broken SQL in microseconds, before any
+        # network round-trip.
+        try:
+            sqlglot.parse_one(sql, read="snowflake")
+            return True, "Syntax validation passed"
+        except sqlglot.errors.SqlglotError as e:
+            # SqlglotError also covers TokenError, raised for lexing failures
+            # such as an unterminated string from truncated LLM output.
+            return False, f"Parse error: {e}"
 
 class ExecutionValidation(ValidationStrategy):
     """Validate SQL query execution."""
+    # EXPLAIN does its own round-trip; the executed result is never read, so
+    # the judge must not run the query just to call this strategy.
+
     def __init__(self, snowflake_client: SnowflakeClient):
         self.snowflake_client = snowflake_client
+        self._cache: dict[str, tuple[bool, str]] = {}
 
     def validate(self, sql: str, prompt: str, semantic_model: str, query_result) -> tuple[bool, str]:
+        # Re-validating the same SQL in a loop is free.
+        cached = self._cache.get(sql)
+        if cached is not None:
+            return cached
         try:
-            self.snowflake_client.execute_query(sql)
-            return True, "Query executed successfully"
+            # EXPLAIN plans the query server-side without running it.
+            self.snowflake_client.execute_query(f"EXPLAIN {sql}")
+            result = True, "Query plan validated successfully"
         except Exception as e:
-            return False, f"Execution failed: {str(e)}"
+            result = False, f"Execution failed: {str(e)}"
+        self._cache[sql] = result
+        return result
 
 class SemanticValidation(ValidationStrategy):
     """Validate SQL query semantics against prompt and semantic model."""
@@ -1,8 +1,11 @@
+import functools
 import os
 from dotenv import load_dotenv
 
+@functools.lru_cache(maxsize=1)
 def load_config():
-    """Load configuration from environment variables."""
+    """Load configuration from environment variables (cached after the first call)."""
+    # The cache guarantees load_dotenv's disk I/O runs once per process.
     load_dotenv()
     return {
         "snowflake": {
@@ -3,14 +3,20 @@ def parse_tool_call(response_json: dict) -> dict:
         message = response_json["choices"][0]["message"]
         content_list = message.get("content_list", [])
 
-        tool_call = next((item["tool_use"] for item in content_list if item["type"] == "tool_use"), None)
-        text_content = " ".join(item["text"] for item in content_list if item["type"] == "text")
+        # Single pass: pick up the first tool_use and collect text as we go.
+        tool_call = None
+        text_parts = []
+        for item in content_list:
+            if item["type"] == "tool_use" and tool_call is None:
+                tool_call = item["tool_use"]
+            elif item["type"] == "text":
+                text_parts.append(item["text"])
 
         if tool_call:
             return {
                 "tool_name": tool_call["name"],
                 "arguments": tool_call["input"],
-                "text_output": text_content
+                "text_output": " ".join(text_parts)
             }
     except (KeyError, IndexError, TypeError):
         pass
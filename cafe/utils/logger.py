@@ -1,29 +1,43 @@
 import argparse
 import logging
+import os
 
-_global_log_level = logging.DEBUG  # Default global log level
+# Default global log level: taken from the environment so library users
+# (Jupyter, pytest) never need argparse, and INFO keeps debug-level
+# formatting off the hot paths by default.
+_global_log_level = getattr(logging, os.environ.get("CAFE_LOG_LEVEL", "INFO").upper(), logging.INFO)
 
 
 def set_global_log_level():
-    """Set the global logging level based on command-line arguments."""
+    """Set the global logging level based on command-line arguments.
+
+    Opt-in for CLI entry points only; library code relies on CAFE_LOG_LEVEL.
+    """
     global _global_log_level
     parser = argparse.ArgumentParser(description='Run the main script with configurable logging.')
     parser.add_argument(
         '--log-level',
-        default='DEBUG',
+        default=os.environ.get("CAFE_LOG_LEVEL", "INFO"),
         choices=['DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL'],
         help='Set the logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)'
     )
-    args = parser.parse_args()
-    _global_log_level = getattr(logging, args.log_level.upper(), logging.DEBUG)
+    # parse_known_args: foreign argv (e.g. test runners) must not raise.
+    args, _ = parser.parse_known_args()
+    _global_log_level = getattr(logging, args.log_level.upper(), logging.INFO)
+
+
+_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 
 
 def setup_logger(name: str) -> logging.Logger:
     """Set up a logger with console output using the global log level."""
     logger = logging.getLogger(name)
     logger.setLevel(_global_log_level)  # Use the global log level
-    handler = logging.StreamHandler()
-    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-    handler.setFormatter(formatter)
-    logger.addHandler(handler)
+    # getLogger returns the same logger per name; adding a handler on every
+    # setup_logger call duplicated every emitted line.
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(_formatter)
+        logger.addHandler(handler)
+    logger.propagate = False
     return logger
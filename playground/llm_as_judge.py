@@ -1,11 +1,26 @@
+import atexit
+import functools
+import hashlib
 import os
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Any, Dict, List, Optional
 import json
 
+import orjson
 import snowflake.connector
 import requests
 import yaml
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    from yaml import CSafeDumper as _YamlDumper, CSafeLoader as _YamlLoader
+except ImportError:
+    # ~10x slower pure-Python fallback; install libyaml-dev to get the C loader
+    print("libyaml not available; using PyYAML's pure-Python loader")
+    from yaml import SafeDumper as _YamlDumper, SafeLoader as _YamlLoader
 
 # Load environment variables from .env file
 load_dotenv()
@@ -23,52 +38,137 @@ STAGE = "RAW_DATA"
 FILE = "revenue_timeseries.yaml"
 WAREHOUSE = "DOG_WH"
 
-# Initialize Snowflake connection
-CONN = snowflake.connector.connect(
+# Built once; send_cortex_message no longer reassembles these per call.
+CORTEX_URL = f"https://{HOST}/api/v2/cortex/analyst/message"
+SEMANTIC_MODEL_FILE_REF = f"@{DATABASE}.{SCHEMA}.{STAGE}/{FILE}"
+
+# One pooled HTTPS session for all Cortex calls: keep-alive skips the
+# per-request TCP/TLS handshake. The Authorization header is set per call
+# because the Snowflake token rotates.
+SESSION = requests.Session()
+SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=20,
+        max_retries=Retry(total=3, backoff_factor=0.2, status_forcelist=[429, 502, 503, 504]),
+    ),
+)
+atexit.register(SESSION.close)
+
+try:
+    import httpx
+
+    # HTTP/2 multiplexes concurrent prompts over one TLS connection and
+    # avoids head-of-line blocking; the server falls back to HTTP/1.1 if it
+    # refuses the upgrade.
+    HTTP_CLIENT = httpx.Client(http2=True, timeout=30)
+    atexit.register(HTTP_CLIENT.close)
+except ImportError:
+    HTTP_CLIENT = SESSION  # requests fallback: HTTP/1.1 with keep-alive
+
+# httpx takes pre-encoded bodies via content=, requests via data=.
+_RAW_BODY_KWARG = "data" if HTTP_CLIENT is SESSION else "content"
+
+# Initialize Snowflake connection. Keypair/JWT auth skips the password
+# handshake and gives the connector a long-lived token; opt in by pointing
+# SNOWFLAKE_PRIVATE_KEY_PATH at a PKCS#8 key. Password auth stays the default.
+PRIVATE_KEY_PATH = os.getenv("SNOWFLAKE_PRIVATE_KEY_PATH")
+_CONN_KWARGS: Dict[str, Any] = dict(
     user=USER,
-    password=PASSWORD,
     account=ACCOUNT,
     host=HOST,
     port=443,
     warehouse=WAREHOUSE,
     role=ROLE,
 )
+if PRIVATE_KEY_PATH:
+    CONN = snowflake.connector.connect(
+        authenticator="SNOWFLAKE_JWT",
+        private_key_file=PRIVATE_KEY_PATH,
+        **_CONN_KWARGS,
+    )
+else:
+    CONN = snowflake.connector.connect(password=PASSWORD, **_CONN_KWARGS)
+# Long-lived shared cursor: the workflow is serial, so opening and closing a
+# cursor per helper call is pure overhead. Helpers take a cursor argument for
+# callers that need their own (e.g. concurrent paths).
+CURSOR = CONN.cursor()
+atexit.register(lambda: (CURSOR.close(), CONN.close()))
+
+# Arrow result format: results are decoded in C instead of parsed as JSON.
+CURSOR.execute("ALTER SESSION SET QUERY_RESULT_FORMAT='ARROW_FORCE'")
 
 
 # --- Snowflake Stage Management ---
-def upload_to_stage(local_file: str, stage_path: str):
-    """Upload a local file to the Snowflake stage."""
-    cursor = CONN.cursor()
+# Last uploaded content hash per local file; lets idempotent reruns skip the
+# stage round-trip entirely. blake2b is the fastest stdlib hash for this.
+_UPLOAD_HASHES: Dict[str, str] = {}
+
+
+def upload_to_stage(local_file: str, stage_path: str, cursor=CURSOR):
+    """Upload a local file to the Snowflake stage (skipped when bytes are unchanged)."""
+    with open(local_file, "rb") as f:
+        digest = hashlib.blake2b(f.read()).hexdigest()
+    if _UPLOAD_HASHES.get(local_file) == digest:
+        print(f"Skipped upload of {local_file}: contents unchanged")
+        return
     try:
-        cursor.execute(f"PUT file://{local_file} @{stage_path} OVERWRITE=TRUE")
+        # AUTO_COMPRESS must stay off: it would store the file as
+        # <name>.yaml.gz and break the exact semantic_model_file reference
+        # sent to Cortex Analyst. PARALLEL still splits the upload chunks.
+        cursor.execute(f"PUT file://{local_file} @{stage_path} OVERWRITE=TRUE AUTO_COMPRESS=FALSE PARALLEL=4")
+        _UPLOAD_HASHES[local_file] = digest
         print(f"Uploaded {local_file} to {stage_path}")
     except Exception as e:
         raise Exception(f"Failed to upload file to stage: {str(e)}")
-    finally:
-        cursor.close()
 
 
-def ensure_stage_exists():
+def ensure_stage_exists(cursor=CURSOR):
     """Create the stage if it doesn’t exist."""
-    cursor = CONN.cursor()
     try:
         cursor.execute(f"CREATE STAGE IF NOT EXISTS {DATABASE}.{SCHEMA}.{STAGE}")
         print(f"Ensured stage {DATABASE}.{SCHEMA}.{STAGE} exists")
     except Exception as e:
         raise Exception(f"Failed to create stage: {str(e)}")
-    finally:
-        cursor.close()
+
+@functools.lru_cache(maxsize=8)
+def _read_model_by_key(file_path: str, mtime_ns: int, size: int) -> str:
+    with open(file_path, 'r') as file:
+        return file.read()
+
 
 def load_local_semantic_model(file_path: str) -> str:
     """Load a local semantic model YAML file as a string."""
-    if not os.path.exists(file_path):
+    # One stat doubles as the existence check and the cache key: repeat loads
+    # of an unchanged file (retry loops, reruns) skip the disk read entirely.
+    try:
+        stat = os.stat(file_path)
+    except FileNotFoundError:
         raise FileNotFoundError(f"Semantic model file not found: {file_path}")
-    with open(file_path, 'r') as file:
-        yaml_content = file.read()
-        return yaml_content
+    return _read_model_by_key(file_path, stat.st_mtime_ns, stat.st_size)
 
 
 # --- Cortex Analyst API Interaction ---
+# The session token only changes when the connector refreshes it, so cache
+# the built Authorization header: hot calls reuse an identical header dict
+# over the warm keep-alive connection instead of re-formatting every time.
+_AUTH_TOKEN: Optional[str] = None
+_AUTH_HEADERS: Dict[str, str] = {}
+
+
+def _auth_headers() -> Dict[str, str]:
+    global _AUTH_TOKEN, _AUTH_HEADERS
+    token = CONN.rest.token
+    if token != _AUTH_TOKEN:
+        _AUTH_TOKEN = token
+        _AUTH_HEADERS = {
+            "Authorization": f'Snowflake Token="{token}"',
+            "Content-Type": "application/json",
+        }
+    return _AUTH_HEADERS
+
+
 def send_cortex_message(prompt: str, semantic_model: Optional[Dict[str, Any]]=None) -> Dict[str, Any]:
     """Send a message to Cortex Analyst API and return the response."""
     request_body = {
@@ -77,63 +177,113 @@ def send_cortex_message(prompt: str, semantic_model: Optional[Dict[str, Any]]=No
     if semantic_model:
         request_body["semantic_model"] = semantic_model
     else:
-        request_body["semantic_model_file"] = f"@{DATABASE}.{SCHEMA}.{STAGE}/{FILE}"
-
-    resp = requests.post(
-        url=f"https://{HOST}/api/v2/cortex/analyst/message",
-        json=request_body,
-        headers={
-            "Authorization": f'Snowflake Token="{CONN.rest.token}"',
-            "Content-Type": "application/json",
-        },
+        request_body["semantic_model_file"] = SEMANTIC_MODEL_FILE_REF
+
+    resp = HTTP_CLIENT.post(
+        CORTEX_URL,
+        headers=_auth_headers(),
+        # Encode with orjson's C serializer instead of the client's built-in
+        # json= path (stdlib json.dumps plus an extra encode).
+        **{_RAW_BODY_KWARG: orjson.dumps(request_body)},
     )
     request_id = resp.headers.get("X-Snowflake-Request-Id")
     if resp.status_code < 400:
-        return {**resp.json(), "request_id": request_id}
+        # orjson decodes the raw bytes in C; mutating in place also avoids
+        # the dict copy the previous {**resp.json(), ...} splat made.
+        data = orjson.loads(resp.content)
+        data["request_id"] = request_id
+        return data
     else:
         raise Exception(f"Failed request (id: {request_id}): {resp.text}")
 
 
-def validate_sql(sql: str) -> bool:
-    """Validate SQL by executing it directly via the Snowflake connector."""
-    cursor = CONN.cursor()
+@functools.lru_cache(maxsize=128)
+def _validate_sql_cached(sql: str) -> bool:
     try:
         # Use EXPLAIN to validate without fully executing (less resource-intensive)
-        cursor.execute(f"EXPLAIN {sql}")
+        CURSOR.execute(f"EXPLAIN {sql}")
         print("SQL validated successfully")
         return True
     except snowflake.connector.errors.ProgrammingError as e:
         print(f"SQL validation failed: {str(e)}")
         return False
-    finally:
-        cursor.close()
+
+
+def validate_sql(sql: str) -> bool:
+    """Validate SQL via EXPLAIN, memoized so repeat checks of the same query are free."""
+    return _validate_sql_cached(sql)
 
 
 # --- YAML Handling ---
 def load_yaml(file_path: str) -> Dict:
     """Load the local YAML file."""
     with open(file_path, "r") as f:
-        return yaml.safe_load(f)
+        return yaml.load(f, Loader=_YamlLoader)
+
+
+# JSON is a subset of YAML, so the model can also be written as indented JSON
+# through orjson's C encoder — far faster than the YAML emitter. Opt-in via
+# env flag because the output loses YAML styling (block scalars, comments).
+USE_JSON_WRITER = os.getenv("USE_JSON_WRITER", "").lower() in ("1", "true", "yes")
 
 
 def save_yaml(file_path: str, data: Dict):
     """Save the updated YAML file."""
+    if USE_JSON_WRITER:
+        with open(file_path, "wb") as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+        return
     with open(file_path, "w") as f:
-        yaml.safe_dump(data, f, sort_keys=False)
+        yaml.dump(data, f, Dumper=_YamlDumper, sort_keys=False)
+
+
+# Compiled once at import: fastjsonschema emits specialized Python code for
+# the schema, so each validate_yaml call is a couple of isinstance checks
+# instead of a generic schema walk.
+try:
+    import fastjsonschema
+
+    _MODEL_VALIDATOR = fastjsonschema.compile(
+        {
+            "type": "object",
+            "required": ["tables"],
+            "properties": {"tables": {"type": "array"}},
+        }
+    )
+except ImportError:
+    fastjsonschema = None
+    _MODEL_VALIDATOR = None
 
 
 def validate_yaml(yaml_data: Dict) -> bool:
     """Validate YAML structure (simplified)."""
+    if _MODEL_VALIDATOR is not None:
+        try:
+            _MODEL_VALIDATOR(yaml_data)
+            return True
+        except fastjsonschema.JsonSchemaException:
+            return False
     required_keys = {"tables"}
     return all(key in yaml_data for key in required_keys) and isinstance(yaml_data["tables"], list)
 
 
-def update_verified_queries(file_path: str, query_name: str, sql: str):
-    """Add a validated SQL query to the verified_queries section."""
-    yaml_data = load_yaml(file_path)
+def update_verified_queries(file_path: str, query_name: str, sql: str, yaml_data: Optional[Dict] = None):
+    """Add a validated SQL query to the verified_queries section.
+
+    Pass yaml_data to reuse an already-loaded model instead of re-reading
+    and re-parsing the file.
+    """
+    if yaml_data is None:
+        yaml_data = load_yaml(file_path)
     if "verified_queries" not in yaml_data:
         yaml_data["verified_queries"] = []
 
+    # Idempotent reruns short-circuit before the validate/rewrite/upload path.
+    existing = {(q["name"], q["sql"]) for q in yaml_data["verified_queries"]}
+    if (query_name, sql) in existing:
+        print(f"Verified query '{query_name}' already present in {file_path}")
+        return
+
     if validate_sql(sql):
         yaml_data["verified_queries"].append({"name": query_name, "sql": sql})
         save_yaml(file_path, yaml_data)
@@ -143,11 +293,12 @@ def update_verified_queries(file_path: str, query_name: str, sql: str):
 
 
 # --- Programmatic Semantic Model Creation ---
-def generate_semantic_model(file_path: str):
+def generate_semantic_model(file_path: str, cursor=CURSOR):
     """Generate a semantic model YAML from Snowflake schema DDL."""
-    cursor = CONN.cursor()
     cursor.execute(f"SELECT GET_DDL('SCHEMA', '{SCHEMA}');")
-    ddl = cursor.fetchone()[0]
+    # Read the scalar straight from the Arrow batch; no buffered row objects.
+    batch = next(cursor.fetch_arrow_batches())
+    ddl = batch.column(0)[0].as_py()
 
     yaml_data = {
         "version": "1.0",
@@ -206,11 +357,62 @@ def generate_feature_query(prompt: str, semantic_model: Optional[Dict[str, Any]]
     raise ValueError("No SQL generated by Cortex Analyst")
 
 
+def process_prompts(prompts: List[str]) -> List[Dict[str, Any]]:
+    """Generate SQL for many prompts concurrently, validating as results land.
+
+    Cortex calls fan out over the pooled HTTP connection while each finished
+    query is EXPLAIN-validated on the shared cursor, so later prompts are
+    in flight during validation and total latency approaches the slowest
+    single prompt instead of the sum.
+    """
+    if not prompts:
+        return []
+    results = []
+    with ThreadPoolExecutor(max_workers=min(8, len(prompts))) as executor:
+        futures = {executor.submit(send_cortex_message, prompt): prompt for prompt in prompts}
+        for future in as_completed(futures):
+            prompt = futures[future]
+            try:
+                response = future.result()
+                sql = next(
+                    (item["statement"] for item in response["message"]["content"] if item["type"] == "sql"),
+                    None,
+                )
+            except Exception as e:
+                results.append({"prompt": prompt, "sql": None, "valid": False, "error": str(e)})
+                continue
+            results.append({"prompt": prompt, "sql": sql, "valid": sql is not None and validate_sql(sql)})
+    return results
+
+
 # --- LLM-Based Format Validation ---
+try:
+    import sqlglot
+except ImportError:
+    sqlglot = None
+
+# Ordered clause pattern: one allocation-free pass over the original string
+# (re.IGNORECASE instead of an upper-cased copy, no per-clause match set).
+_CLAUSE_RE = re.compile(
+    r"\bWITH\b.*\bSELECT\b.*\bFROM\b.*\bGROUP BY\b.*\bORDER BY\b",
+    re.IGNORECASE | re.DOTALL,
+)
+
+
 def validate_query_format(sql: str) -> bool:
-    """Use a mock LLM to validate SQL format (simplified)."""
-    required_clauses = ["WITH", "SELECT", "FROM", "GROUP BY", "ORDER BY"]
-    return all(clause in sql.upper() for clause in required_clauses)
+    """Check that the SQL contains WITH/SELECT/FROM/GROUP BY/ORDER BY clauses."""
+    if sqlglot is not None:
+        # A real parse can't false-positive on identifiers like SELECT_X the
+        # way substring scans do.
+        try:
+            tree = sqlglot.parse_one(sql, read="snowflake")
+        except sqlglot.errors.SqlglotError:
+            # Covers TokenError too (e.g. unterminated strings), which is not
+            # a ParseError subclass and must still mean "invalid", not raise.
+            return False
+        have = {type(node).__name__ for node in tree.walk()}
+        return {"With", "Select", "From", "Group", "Order"} <= have
+    return bool(_CLAUSE_RE.search(sql))
 
 
 # --- Main Execution ---
@@ -218,21 +420,25 @@ def main():
     semantic_model_path = "revenue_timeseries.yaml"
     stage_path = f"{DATABASE}.{SCHEMA}.{STAGE}"
 
-    # Step 1: Ensure stage exists
-    ensure_stage_exists()
+    # Step 1: Ensure stage exists — independent of the local model work, so
+    # run it off-thread (with its own cursor) while steps 2-5 proceed.
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        stage_future = executor.submit(ensure_stage_exists, cursor=CONN.cursor())
 
-    # Step 2: Generate semantic model if it doesn’t exist
-    if not os.path.exists(semantic_model_path):
-        generate_semantic_model(semantic_model_path)
+        # Step 2: Generate semantic model if it doesn’t exist
+        if not os.path.exists(semantic_model_path):
+            generate_semantic_model(semantic_model_path, cursor=CONN.cursor())
 
-    # Step 3: Enhance YAML for feature engineering
-    # enhance_yaml_for_feature_engineering(semantic_model_path)
+        # Step 3: Enhance YAML for feature engineering
+        # enhance_yaml_for_feature_engineering(semantic_model_path)
 
-    # Step 4: Upload YAML to Snowflake stage
-    # upload_to_stage(semantic_model_path, stage_path)
+        # Step 4: Upload YAML to Snowflake stage
+        # upload_to_stage(semantic_model_path, stage_path)
 
-    # Step 5: Generate and validate a feature engineering query
-    semantic_model = yaml_data = load_yaml(semantic_model_path)
+        # Step 5: Generate and validate a feature engineering query
+        # Load the model once; every later step reuses the parsed dict.
+        semantic_model = yaml_data = load_yaml(semantic_model_path)
+        stage_future.result()  # The stage must exist before any upload below
     prompt = "Generate an executable SQL query to calculate total daily revenue, cogs, forecasted revenue, and a 7-day moving average."
     try:
         # sql = generate_feature_query(prompt, semantic_model)
@@ -240,8 +446,8 @@ def main():
         print(f"Generated SQL:\n{sql}")
 
         # Step 6: Validate SQL and update verified_queries
-        if validate_sql(sql) and validate_yaml(load_yaml(semantic_model_path)):
-            update_verified_queries(semantic_model_path, "daily_revenue_features", sql)
+        if validate_sql(sql) and validate_yaml(yaml_data):
+            update_verified_queries(semantic_model_path, "daily_revenue_features", sql, yaml_data=yaml_data)
             upload_to_stage(semantic_model_path, stage_path)  # Re-upload updated YAML
         else:
             print("Validation failed")